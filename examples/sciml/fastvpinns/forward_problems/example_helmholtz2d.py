@@ -253,6 +253,8 @@ train_dirichlet_input, train_dirichlet_output = datahandler.get_dirichlet_input(
 bilinear_params_dict = datahandler.get_bilinear_params_dict_as_tensors(
     get_bilinear_params_dict
 )
+# precompute k^2 once, instead of squaring k inside the loss at every step
+bilinear_params_dict["k_sq"] = bilinear_params_dict["k"] ** 2
 
 model = DenseModel(
     layer_dims=[2, 30, 30, 30, 1],
@@ -37,6 +37,7 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from pathlib import Path
+import contextlib
 import tensorflow as tf
 import time
 from tqdm import tqdm
@@ -80,6 +81,7 @@ i_learning_rate_dict = {
 
 i_dtype = tf.float32
 i_num_epochs = 150000  # Number of epochs
+i_data_parallel = False  # Data parallel training over all the visible GPUs
 
 # penalty parameter for boundary loss
 i_beta_boundary = 0.01
@@ -357,26 +359,48 @@ if not folder.exists():
     folder.mkdir(parents=True, exist_ok=True)
 
 
-model = DenseModel(
-    layer_dims=[3, 30, 50, 50, 50, 50, 30, 3],
-    learning_rate_dict=i_learning_rate_dict,
-    loss_function=pde_loss_maxwell,
-    input_tensors_list=[
-        input_points,
-        boundary_points,
-        boundary_values,
-        initial_boundary_points_Ez,
-        initial_boundary_values_Ez,
-        initial_boundary_points_Hx,
-        initial_boundary_values_Hx,
-        initial_boundary_points_Hy,
-        initial_boundary_values_Hy,
-    ],
-    force_function_values=rhs_values,
-    tensor_dtype=i_dtype,
-    activation=i_activation,
-)
+# For data parallel training the model is created within the scope of a
+# mirrored strategy, the collocation points are sharded across the GPUs
+if i_data_parallel:
+    strategy = tf.distribute.MirroredStrategy()
+    model_scope = strategy.scope()
+else:
+    strategy = None
+    model_scope = contextlib.nullcontext()
+
+with model_scope:
+    model = DenseModel(
+        layer_dims=[3, 30, 50, 50, 50, 50, 30, 3],
+        learning_rate_dict=i_learning_rate_dict,
+        loss_function=pde_loss_maxwell,
+        input_tensors_list=[
+            input_points,
+            boundary_points,
+            boundary_values,
+            initial_boundary_points_Ez,
+            initial_boundary_values_Ez,
+            initial_boundary_points_Hx,
+            initial_boundary_values_Hx,
+            initial_boundary_points_Hy,
+            initial_boundary_values_Hy,
+        ],
+        force_function_values=rhs_values,
+        tensor_dtype=i_dtype,
+        activation=i_activation,
+        distribute_strategy=strategy,
+    )
 
+train_step = model.distributed_train_step if i_data_parallel else model.train_step
+
+# Pass the penalty parameters as tensors, so that the train step is not
+# retraced for every new python float, and trace it once before training
+beta_boundary = tf.constant(i_beta_boundary, dtype=i_dtype)
+beta_initial = tf.constant(i_beta_initial, dtype=i_dtype)
+train_step.get_concrete_function(
+    beta_boundary=beta_boundary,
+    beta_initial=beta_initial,
+    bilinear_params_dict=i_bilinear_params_dict,
+)
 
 loss_array = []  # total loss
 time_array = []  # time taken for each epoch
@@ -386,9 +410,9 @@ for epoch in tqdm(range(i_num_epochs)):
     # Train the model
     batch_start_time = time.time()
     if epoch <= i_num_epochs:
-        loss = model.train_step(
-            beta_boundary=i_beta_boundary,
-            beta_initial=i_beta_initial,
+        loss = train_step(
+            beta_boundary=beta_boundary,
+            beta_initial=beta_initial,
             bilinear_params_dict=i_bilinear_params_dict,
         )
         loss_array.append(loss["loss"])
@@ -87,16 +87,22 @@ class DataHandler2D(DataHandler):
         >>> fespace = FESpace2D(mesh, elements)
         >>> domain = Domain2D(bounds)
         >>> handler = DataHandler2D(fespace, domain, tf.float32)
+        >>> # store the test functions in bfloat16
+        >>> handler = DataHandler2D(
+        ...     fespace, domain, tf.float32, test_function_dtype=tf.bfloat16
+        ... )
         >>> dirichlet_input, dirichlet_vals = handler.get_dirichlet_input()
         >>> test_points = handler.get_test_points()
 
     Note:
         All input numpy arrays are assumed to be float64. The class handles
         conversion to the specified tensorflow dtype (typically float32)
-        for computational efficiency.
+        for computational efficiency. Test functions stored in a reduced
+        test_function_dtype are only supported by pde_loss_helmholtz,
+        pde_loss_poisson_inverse and pde_loss_cd2d_inverse_domain.
     """
 
-    def __init__(self, fespace, domain, dtype):
+    def __init__(self, fespace, domain, dtype, test_function_dtype=None):
         """
         Constructor for the DataHandler2D class
 
@@ -104,9 +110,19 @@ class DataHandler2D(DataHandler):
             fespace (FESpace2D): The FESpace2D object.
             domain (Domain2D): The Domain2D object.
             dtype (tf.DType): The tensorflow dtype to be used for all the tensors.
+            test_function_dtype (tf.DType): Optional dtype for storing the test
+                function matrices (e.g. tf.bfloat16). Defaults to `dtype`.
+                Only supported by pde_loss_helmholtz, pde_loss_poisson_inverse
+                and pde_loss_cd2d_inverse_domain, which accumulate the
+                contractions in the dtype of the NN predictions. The other
+                losses fail at train time with a dtype mismatch.
 
         Returns:
             None
+
+        Raises:
+            TypeError: If dtype or test_function_dtype is not a valid
+                tensorflow dtype
         """
         # call the parent class constructor
         super().__init__(fespace=fespace, domain=domain, dtype=dtype)
@@ -154,6 +170,20 @@ class DataHandler2D(DataHandler):
         self.grad_x_mat_list = tf.stack(self.grad_x_mat_list, axis=0)
         self.grad_y_mat_list = tf.stack(self.grad_y_mat_list, axis=0)
 
+        # The test function matrices are constant during training and dominate
+        # the memory traffic of the loss, so they can be stored once in a
+        # reduced precision, see the docstring for the supported losses
+        if test_function_dtype is not None:
+            if not isinstance(test_function_dtype, tf.DType):
+                raise TypeError(
+                    "The given test_function_dtype is not a valid tensorflow dtype"
+                )
+            self.shape_val_mat_list = tf.cast(
+                self.shape_val_mat_list, test_function_dtype
+            )
+            self.grad_x_mat_list = tf.cast(self.grad_x_mat_list, test_function_dtype)
+            self.grad_y_mat_list = tf.cast(self.grad_y_mat_list, test_function_dtype)
+
         # test points
         self.test_points = None
 
@@ -54,6 +54,7 @@ import copy
 
 # import tensorflow wrapper
 from ....dl.tensorflow_wrapper import TensorflowDense
+from ..physics.loss_inputs import precompute_loss_inputs
 
 
 # Custom Model
@@ -163,13 +164,6 @@ class DenseModel(tf.keras.Model):
             raise TypeError("The given dtype is not a valid tensorflow dtype")
 
         self.orig_factor_matrices = orig_factor_matrices
-        self.shape_function_mat_list = copy.deepcopy(orig_factor_matrices[0])
-        self.shape_function_grad_x_factor_mat_list = copy.deepcopy(
-            orig_factor_matrices[1]
-        )
-        self.shape_function_grad_y_factor_mat_list = copy.deepcopy(
-            orig_factor_matrices[2]
-        )
 
         self.force_function_list = force_function_list
 
@@ -180,12 +174,15 @@ class DenseModel(tf.keras.Model):
 
         self.params_dict = params_dict
 
-        self.pre_multiplier_val = self.shape_function_mat_list
-        self.pre_multiplier_grad_x = self.shape_function_grad_x_factor_mat_list
-        self.pre_multiplier_grad_y = self.shape_function_grad_y_factor_mat_list
-
         self.force_matrix = self.force_function_list
 
+        # Test function matrices as passed to the loss function, with the
+        # inputs accepted by the loss precomputed once instead of every step
+        self.loss_inputs = precompute_loss_inputs(
+            self.loss_function, orig_factor_matrices, self.force_matrix
+        )
+        self.n_quad_points = orig_factor_matrices[0].shape[-1]
+
         print(f"{'-'*74}")
         print(f"| {'PARAMETER':<25} | {'SHAPE':<25} |")
         print(f"{'-'*74}")
@@ -195,15 +192,9 @@ class DenseModel(tf.keras.Model):
         print(
             f"| {'force_matrix':<25} | {str(self.force_matrix.shape):<25} | {self.force_matrix.dtype}"
         )
-        print(
-            f"| {'pre_multiplier_grad_x':<25} | {str(self.pre_multiplier_grad_x.shape):<25} | {self.pre_multiplier_grad_x.dtype}"
-        )
-        print(
-            f"| {'pre_multiplier_grad_y':<25} | {str(self.pre_multiplier_grad_y.shape):<25} | {self.pre_multiplier_grad_y.dtype}"
-        )
-        print(
-            f"| {'pre_multiplier_val':<25} | {str(self.pre_multiplier_val.shape):<25} | {self.pre_multiplier_val.dtype}"
-        )
+        for name, value in self.loss_inputs.items():
+            if value is not None:
+                print(f"| {name:<25} | {str(value.shape):<25} | {value.dtype}")
         print(
             f"| {'dirichlet_input':<25} | {str(self.dirichlet_input.shape):<25} | {self.dirichlet_input.dtype}"
         )
@@ -361,25 +352,23 @@ class DenseModel(tf.keras.Model):
             # Split the gradients into x and y components and reshape them to (-1, 1)
             # the reshaping is done for the tensorial operations purposes (refer Notebook)
             pred_grad_x = tf.reshape(
-                gradients[:, 0], [self.n_cells, self.pre_multiplier_grad_x.shape[-1]]
+                gradients[:, 0], [self.n_cells, self.n_quad_points]
             )  # shape : (N_cells , N_quadrature_points)
             pred_grad_y = tf.reshape(
-                gradients[:, 1], [self.n_cells, self.pre_multiplier_grad_y.shape[-1]]
+                gradients[:, 1], [self.n_cells, self.n_quad_points]
             )  # shape : (N_cells , N_quadrature_points)
 
             pred_val = tf.reshape(
-                predicted_values, [self.n_cells, self.pre_multiplier_val.shape[-1]]
+                predicted_values, [self.n_cells, self.n_quad_points]
             )  # shape : (N_cells , N_quadrature_points)
 
             cells_residual = self.loss_function(
-                test_shape_val_mat=self.pre_multiplier_val,
-                test_grad_x_mat=self.pre_multiplier_grad_x,
-                test_grad_y_mat=self.pre_multiplier_grad_y,
                 pred_nn=pred_val,
                 pred_grad_x_nn=pred_grad_x,
                 pred_grad_y_nn=pred_grad_y,
                 forcing_function=self.force_matrix,
                 bilinear_params=bilinear_params_dict,
+                **self.loss_inputs,
             )
 
             residual = tf.reduce_sum(cells_residual)
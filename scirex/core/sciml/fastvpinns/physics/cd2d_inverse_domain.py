@@ -46,8 +46,18 @@ References:
 
 import tensorflow as tf
 
+from .loss_inputs import (
+    accepts_precomputed_inputs,
+    contract_test_functions,
+    pack_test_functions,
+)
+
 
 # PDE loss function for the CD2D inverse problem (Domain)
+# Compiled with XLA, so that the contraction and the pointwise residual
+# assembly that follows it are fused into as few kernels as possible
+@accepts_precomputed_inputs("test_packed_mat", "forcing_mat")
+@tf.function(jit_compile=True, reduce_retracing=True)
 def pde_loss_cd2d_inverse_domain(
     test_shape_val_mat: tf.Tensor,
     test_grad_x_mat: tf.Tensor,
@@ -58,6 +68,8 @@ def pde_loss_cd2d_inverse_domain(
     forcing_function: callable,
     bilinear_params: dict,
     inverse_params_list: list,
+    test_packed_mat: tf.Tensor = None,
+    forcing_mat: tf.Tensor = None,
 ) -> tf.Tensor:
     """Computes domain-based loss for 2D convection-diffusion inverse problem.
 
@@ -79,12 +91,20 @@ def pde_loss_cd2d_inverse_domain(
         pred_grad_y_nn: y-derivative of NN solution at quadrature points
             Shape: (n_elements, n_quad_points)
         forcing_function: Right-hand side forcing term
+            Shape: (n_test_functions, n_elements)
         bilinear_params: Dictionary containing:
             - b_x: x-direction convection coefficient
             - b_y: y-direction convection coefficient
             - c: reaction coefficient
         inverse_params_list: List containing:
             - diffusion coefficient neural network
+              Shape: (n_elements, n_quad_points)
+        test_packed_mat: Optional precomputed test functions, packed by
+            pack_test_functions. The unpacked test functions are not read,
+            and may be None, when it is given
+            Shape: (n_elements, 3 * n_test_functions, n_quad_points)
+        forcing_mat: Optional precomputed transpose of forcing_function
+            Shape: (n_elements, n_test_functions)
 
     Returns:
         Cell-wise residuals averaged over test functions
@@ -101,38 +121,67 @@ def pde_loss_cd2d_inverse_domain(
     # The first values in the inverse_params_list is the number of inverse problems
     diffusion_coeff_NN = inverse_params_list[0]
 
-    # ∫ε.du/dx. dv/dx dΩ
-    pde_diffusion_x = tf.transpose(
-        tf.linalg.matvec(test_grad_x_mat, pred_grad_x_nn * diffusion_coeff_NN)
+    # Test functions packed as [v, dv/dx, dv/dy] along the test function axis
+    # shape : (n_elements, 3 * n_test_functions, n_quad_points)
+    if test_packed_mat is None:
+        test_packed_mat = pack_test_functions(
+            test_shape_val_mat, test_grad_x_mat, test_grad_y_mat
+        )
+    # eps is predicted by the NN at every quadrature point, so it has to stay
+    # inside the integral. It is applied with a single broadcasted multiply on
+    # the stacked gradients.
+    # shape : (n_elements, n_quad_points, 2)
+    pred_grad_mat = tf.stack([pred_grad_x_nn, pred_grad_y_nn], axis=-1)
+    # NN predictions packed as [u, du/dx, du/dy, ε.du/dx, ε.du/dy]
+    # shape : (n_elements, n_quad_points, 5)
+    pred_packed_mat = tf.concat(
+        [
+            pred_nn[..., tf.newaxis],
+            pred_grad_mat,
+            pred_grad_mat * diffusion_coeff_NN[..., tf.newaxis],
+        ],
+        axis=-1,
     )
 
+    # Values, gradients and eps-scaled gradients of u against v, dv/dx and
+    # dv/dy, all computed by a single batched GEMM
+    # shape : (n_elements, 3 * n_test_functions, 5)
+    contraction = contract_test_functions(test_packed_mat, pred_packed_mat)
+
+    # Contractions against v, dv/dx and dv/dy, split without reading the
+    # number of test functions, which is not static once the loss is retraced
+    # shape : (n_elements, n_test_functions, 5)
+    val_block, grad_x_block, grad_y_block = tf.split(contraction, 3, axis=1)
+
+    # ∫u.v dΩ
+    val_u = val_block[..., 0]
+    # ∫du/dx. v dΩ
+    conv_x = val_block[..., 1]
+    # ∫du/dy. v dΩ
+    conv_y = val_block[..., 2]
+    # ∫ε.du/dx. dv/dx dΩ
+    pde_diffusion_x = grad_x_block[..., 3]
     # ∫ε.du/dy. dv/dy dΩ
-    pde_diffusion_y = tf.transpose(
-        tf.linalg.matvec(test_grad_y_mat, pred_grad_y_nn * diffusion_coeff_NN)
-    )
+    pde_diffusion_y = grad_y_block[..., 4]
 
     # eps * ∫ (du/dx. dv/dx + du/dy. dv/dy) dΩ
     # Here our eps is a variable which is to be learned, Which is already premultiplied with the predicted gradient of the neural network
     pde_diffusion = pde_diffusion_x + pde_diffusion_y
 
-    # ∫du/dx. v dΩ
-    conv_x = tf.transpose(tf.linalg.matvec(test_shape_val_mat, pred_grad_x_nn))
-
-    # # ∫du/dy. v dΩ
-    conv_y = tf.transpose(tf.linalg.matvec(test_shape_val_mat, pred_grad_y_nn))
-
     # # b(x) * ∫du/dx. v dΩ + b(y) * ∫du/dy. v dΩ
     conv = bilinear_params["b_x"] * conv_x + bilinear_params["b_y"] * conv_y
 
     # reaction term
     # ∫c.u.v dΩ
-    reaction = bilinear_params["c"] * tf.transpose(
-        tf.linalg.matvec(test_shape_val_mat, pred_nn)
-    )
+    reaction = bilinear_params["c"] * val_u
+
+    # shape : (n_elements, n_test_functions)
+    if forcing_mat is None:
+        forcing_mat = tf.transpose(forcing_function)
 
-    residual_matrix = (pde_diffusion + conv + reaction) - forcing_function
+    residual_matrix = (pde_diffusion + conv + reaction) - forcing_mat
 
-    # Perform Reduce mean along the axis 0
-    residual_cells = tf.reduce_mean(tf.square(residual_matrix), axis=0)
+    # Perform Reduce mean along the test functions (axis 1)
+    residual_cells = tf.reduce_mean(tf.square(residual_matrix), axis=1)
 
     return residual_cells
@@ -46,7 +46,17 @@ References:
 
 import tensorflow as tf
 
+from .loss_inputs import (
+    accepts_precomputed_inputs,
+    contract_test_functions,
+    pack_test_functions,
+)
 
+
+# Compiled with XLA, so that the contraction and the pointwise residual
+# assembly that follows it are fused into as few kernels as possible
+@accepts_precomputed_inputs("test_packed_mat", "forcing_mat")
+@tf.function(jit_compile=True, reduce_retracing=True)
 def pde_loss_helmholtz(
     test_shape_val_mat: tf.Tensor,
     test_grad_x_mat: tf.Tensor,
@@ -56,6 +66,8 @@ def pde_loss_helmholtz(
     pred_grad_y_nn: tf.Tensor,
     forcing_function: callable,
     bilinear_params: dict,
+    test_packed_mat: tf.Tensor = None,
+    forcing_mat: tf.Tensor = None,
 ) -> tf.Tensor:
     """Calculates residual for 2D Helmholtz equation.
 
@@ -76,9 +88,18 @@ def pde_loss_helmholtz(
         pred_grad_y_nn: y-derivative of NN solution at quadrature points
             Shape: (n_elements, n_quad_points)
         forcing_function: Right-hand side forcing term
+            Shape: (n_test_functions, n_elements)
         bilinear_params: Dictionary containing:
             eps: Diffusion coefficient (typically 1.0)
             k: Wave number parameter
+            k_sq: Optional precomputed value of k², used instead of k
+                when present
+        test_packed_mat: Optional precomputed test functions, packed by
+            pack_test_functions. The unpacked test functions are not read,
+            and may be None, when it is given
+            Shape: (n_elements, 3 * n_test_functions, n_quad_points)
+        forcing_mat: Optional precomputed transpose of forcing_function
+            Shape: (n_elements, n_test_functions)
 
     Returns:
         Cell-wise residuals averaged over test functions
@@ -91,22 +112,51 @@ def pde_loss_helmholtz(
         Implementation handles high wave numbers through efficient
         tensor operations.
     """
-    #  ∫ (du/dx. dv/dx ) dΩ
-    pde_diffusion_x = tf.transpose(tf.linalg.matvec(test_grad_x_mat, pred_grad_x_nn))
-
-    #  ∫ (du/dy. dv/dy ) dΩ
-    pde_diffusion_y = tf.transpose(tf.linalg.matvec(test_grad_y_mat, pred_grad_y_nn))
+    # Test functions packed as [v, dv/dx, dv/dy] along the test function axis
+    # shape : (n_elements, 3 * n_test_functions, n_quad_points)
+    if test_packed_mat is None:
+        test_packed_mat = pack_test_functions(
+            test_shape_val_mat, test_grad_x_mat, test_grad_y_mat
+        )
+    # NN predictions packed as [u, du/dx, du/dy]
+    # shape : (n_elements, n_quad_points, 3)
+    pred_packed_mat = tf.stack([pred_nn, pred_grad_x_nn, pred_grad_y_nn], axis=-1)
+
+    # All the contractions of the test functions with the NN predictions are
+    # computed by a single batched GEMM
+    # shape : (n_elements, 3 * n_test_functions, 3)
+    contraction = contract_test_functions(test_packed_mat, pred_packed_mat)
+
+    # Contractions against v, dv/dx and dv/dy, split without reading the
+    # number of test functions, which is not static once the loss is retraced
+    # shape : (n_elements, n_test_functions, 3)
+    val_block, grad_x_block, grad_y_block = tf.split(contraction, 3, axis=1)
+
+    # ∫ u.v dΩ
+    val_contraction = val_block[..., 0]
+    # ∫ (du/dx. dv/dx ) dΩ
+    pde_diffusion_x = grad_x_block[..., 1]
+    # ∫ (du/dy. dv/dy ) dΩ
+    pde_diffusion_y = grad_y_block[..., 2]
 
     # eps * ∫ (du/dx. dv/dx + du/dy. dv/dy) dΩ
     pde_diffusion = bilinear_params["eps"] * (pde_diffusion_x + pde_diffusion_y)
 
+    # k^2 is precomputed by the caller when available
+    if "k_sq" in bilinear_params:
+        k_sq = bilinear_params["k_sq"]
+    else:
+        k_sq = bilinear_params["k"] ** 2
+
     # \int(k^2 (u).v) dw
-    helmholtz_additional = (bilinear_params["k"] ** 2) * tf.transpose(
-        tf.linalg.matvec(test_shape_val_mat, pred_nn)
-    )
+    helmholtz_additional = k_sq * val_contraction
+
+    # shape : (n_elements, n_test_functions)
+    if forcing_mat is None:
+        forcing_mat = tf.transpose(forcing_function)
 
-    residual_matrix = -1.0 * (pde_diffusion) + helmholtz_additional - forcing_function
+    residual_matrix = -1.0 * (pde_diffusion) + helmholtz_additional - forcing_mat
 
-    residual_cells = tf.reduce_mean(tf.square(residual_matrix), axis=0)
+    residual_cells = tf.reduce_mean(tf.square(residual_matrix), axis=1)
 
     return residual_cells
@@ -0,0 +1,163 @@
+# Copyright (c) 2024 Zenteiq Aitech Innovations Private Limited and
+# AiREX Lab, Indian Institute of Science, Bangalore.
+# All rights reserved.
+#
+# This file is part of SciREX
+# (Scientific Research and Engineering eXcellence Platform),
+# developed jointly by Zenteiq Aitech Innovations and AiREX Lab
+# under the guidance of Prof. Sashikumaar Ganesan.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any clarifications or special considerations,
+# please contact: contact@scirex.org
+
+"""Precomputed Inputs of the FastVPINNs Loss Functions.
+
+This module implements the helpers shared by the loss functions which
+contract all the test functions with the NN predictions in a single batched
+GEMM, and by the models which precompute the inputs of these losses once,
+instead of at every training step.
+
+Key functions:
+    - accepts_precomputed_inputs: Declares the precomputed inputs of a loss
+    - pack_test_functions: Packs the test functions for a single GEMM
+    - contract_test_functions: Contracts the test functions with predictions
+    - precompute_loss_inputs: Builds the test function inputs of a loss
+
+Note:
+    A loss receives the precomputed inputs only if it declares them with
+    accepts_precomputed_inputs, all the other losses are called with the
+    plain test function matrices.
+"""
+
+import tensorflow as tf
+
+# Inputs which a loss function can accept precomputed
+PRECOMPUTED_INPUTS = ("test_packed_mat", "forcing_mat")
+
+
+def accepts_precomputed_inputs(*input_names: str) -> callable:
+    """Declares the precomputed inputs accepted by a loss function.
+
+    Args:
+        *input_names: Names of the precomputed inputs, out of
+            PRECOMPUTED_INPUTS, accepted as keyword arguments by the loss
+
+    Returns:
+        callable: Decorator recording the inputs on the loss function
+
+    Raises:
+        ValueError: If an input name is not in PRECOMPUTED_INPUTS
+    """
+    for input_name in input_names:
+        if input_name not in PRECOMPUTED_INPUTS:
+            raise ValueError(
+                f"Unknown precomputed input {input_name}, expected one of "
+                f"{PRECOMPUTED_INPUTS}"
+            )
+
+    def decorator(loss_function):
+        loss_function.precomputed_inputs = frozenset(input_names)
+        return loss_function
+
+    return decorator
+
+
+def pack_test_functions(
+    test_shape_val_mat: tf.Tensor,
+    test_grad_x_mat: tf.Tensor,
+    test_grad_y_mat: tf.Tensor,
+) -> tf.Tensor:
+    """Packs the test functions as [v, dv/dx, dv/dy] along the test axis.
+
+    Args:
+        test_shape_val_mat: Test function values at quadrature points
+            Shape: (n_elements, n_test_functions, n_quad_points)
+        test_grad_x_mat: Test function x-derivatives at quadrature points
+            Shape: (n_elements, n_test_functions, n_quad_points)
+        test_grad_y_mat: Test function y-derivatives at quadrature points
+            Shape: (n_elements, n_test_functions, n_quad_points)
+
+    Returns:
+        Packed test functions
+            Shape: (n_elements, 3 * n_test_functions, n_quad_points)
+    """
+    return tf.concat([test_shape_val_mat, test_grad_x_mat, test_grad_y_mat], axis=1)
+
+
+def contract_test_functions(test_mat: tf.Tensor, pred_mat: tf.Tensor) -> tf.Tensor:
+    """Contracts the test functions with the NN predictions.
+
+    The test functions may be stored in reduced precision (e.g. bfloat16) to
+    halve their memory footprint. They are upcast to the dtype of the
+    predictions before the contraction, so that the products are accumulated
+    in full precision and the gradients with respect to the predictions keep
+    their dtype. Inside a loss compiled with XLA the cast is part of the same
+    cluster as the contraction.
+
+    Args:
+        test_mat: Test functions at quadrature points
+            Shape: (n_elements, n_test_functions, n_quad_points)
+        pred_mat: NN predictions at quadrature points
+            Shape: (n_elements, n_quad_points, n_predictions)
+
+    Returns:
+        Contractions in the dtype of the predictions
+            Shape: (n_elements, n_test_functions, n_predictions)
+    """
+    return tf.matmul(tf.cast(test_mat, pred_mat.dtype), pred_mat)
+
+
+def precompute_loss_inputs(
+    loss_function: callable, test_function_mats: list, forcing_matrix: tf.Tensor
+) -> dict:
+    """Builds the test function inputs of a loss function.
+
+    The inputs declared by the loss with accepts_precomputed_inputs are
+    computed here once. When the loss accepts the packed test functions, the
+    unpacked matrices are passed as None, so that only the packed copy has to
+    be kept alive by the caller.
+
+    Args:
+        loss_function: Loss function to build the inputs for
+        test_function_mats: List containing:
+            [0]: Test function values at quadrature points
+            [1]: Test function x-derivatives at quadrature points
+            [2]: Test function y-derivatives at quadrature points
+        forcing_matrix: Right-hand side forcing term
+            Shape: (n_test_functions, n_elements)
+
+    Returns:
+        dict: Keyword arguments of the loss for the test functions and the
+            precomputed inputs
+    """
+    precomputed_inputs = getattr(loss_function, "precomputed_inputs", frozenset())
+
+    loss_inputs = {
+        "test_shape_val_mat": test_function_mats[0],
+        "test_grad_x_mat": test_function_mats[1],
+        "test_grad_y_mat": test_function_mats[2],
+    }
+
+    if "test_packed_mat" in precomputed_inputs:
+        loss_inputs["test_packed_mat"] = pack_test_functions(*test_function_mats)
+        loss_inputs.update(
+            test_shape_val_mat=None, test_grad_x_mat=None, test_grad_y_mat=None
+        )
+
+    if "forcing_mat" in precomputed_inputs:
+        # shape : (n_elements, n_test_functions)
+        loss_inputs["forcing_mat"] = tf.transpose(forcing_matrix)
+
+    return loss_inputs
@@ -48,7 +48,6 @@ Versions:
 import tensorflow as tf
 from tensorflow.keras import layers
 from tensorflow.keras import initializers
-import copy
 import numpy as np
 
 # import tensorflow wrapper
@@ -80,6 +79,7 @@ class DenseModel(tf.keras.Model):
         use_attention: Whether to use attention mechanism
         activation: Activation function for hidden layers
         optimizer: Adam optimizer with optional learning rate schedule
+        strategy: Optional tf.distribute strategy for data parallel training
 
     Example:
         >>> model = DenseModel(
@@ -90,6 +90,13 @@ class DenseModel(tf.keras.Model):
         ... )
         >>> history = model.fit(x_train, epochs=1000)
 
+        Data parallel training over all visible GPUs:
+
+        >>> strategy = tf.distribute.MirroredStrategy()
+        >>> with strategy.scope():
+        ...     model = DenseModel(..., distribute_strategy=strategy)
+        >>> loss = model.distributed_train_step(beta_boundary, beta_initial)
+
     Note:
         The training process balances PDE residuals and boundary conditions
         through a weighted loss function.
@@ -106,6 +113,7 @@ class DenseModel(tf.keras.Model):
         use_attention=False,
         activation="tanh",
         hessian=False,
+        distribute_strategy=None,
     ):
         """
         Initialize the DenseModel class.
@@ -129,15 +137,25 @@ class DenseModel(tf.keras.Model):
             use_attention (bool): Whether to use attention mechanism, defaults to False.
             activation (str): Activation function for hidden layers, defaults to "tanh".
             hessian (bool): Whether to compute Hessian matrix, defaults to False.
+            distribute_strategy: A tf.distribute strategy (e.g.
+                tf.distribute.MirroredStrategy) for data parallel training with
+                distributed_train_step. The model must be created within its
+                scope, and force_function_values must hold one row per
+                collocation point. Defaults to None (single device).
 
         Returns:
             None
+
+        Raises:
+            TypeError: If tensor_dtype is not a valid tensorflow dtype
+            ValueError: If the model is created outside the scope of
+                distribute_strategy, or the collocation points cannot be
+                sharded across its replicas
         """
         super(DenseModel, self).__init__()
         self.layer_dims = layer_dims
         self.use_attention = use_attention
         self.activation = activation
-        self.layer_list = []
         self.loss_function = loss_function
         self.hessian = hessian
 
@@ -147,21 +165,110 @@ class DenseModel(tf.keras.Model):
         if not isinstance(self.tensor_dtype, tf.DType):
             raise TypeError("The given dtype is not a valid tensorflow dtype")
 
+        self.strategy = distribute_strategy
+
+        # the variables must be mirrored on every replica of the strategy
+        if (
+            self.strategy is not None
+            and tf.distribute.get_strategy() is not self.strategy
+        ):
+            raise ValueError(
+                "The model must be created within the scope of the given "
+                "distribute_strategy"
+            )
+
         self.force_function_values = force_function_values
 
         self.input_tensors_list = input_tensors_list
-        self.input_tensor = copy.deepcopy(input_tensors_list[0])
-        self.dirichlet_input = copy.deepcopy(input_tensors_list[1])
-        self.dirichlet_actual = copy.deepcopy(input_tensors_list[2])
-        self.initial_Ez_input = copy.deepcopy(input_tensors_list[3])
-        self.initial_Ez_actual = copy.deepcopy(input_tensors_list[4])
-        self.initial_Hx_input = copy.deepcopy(input_tensors_list[5])
-        self.initial_Hx_actual = copy.deepcopy(input_tensors_list[6])
-        self.initial_Hy_input = copy.deepcopy(input_tensors_list[7])
-        self.initial_Hy_actual = copy.deepcopy(input_tensors_list[8])
+        self.input_tensor = input_tensors_list[0]
+        self.dirichlet_input = input_tensors_list[1]
+        self.dirichlet_actual = input_tensors_list[2]
+        self.initial_Ez_input = input_tensors_list[3]
+        self.initial_Ez_actual = input_tensors_list[4]
+        self.initial_Hx_input = input_tensors_list[5]
+        self.initial_Hx_actual = input_tensors_list[6]
+        self.initial_Hy_input = input_tensors_list[7]
+        self.initial_Hy_actual = input_tensors_list[8]
+
+        # Concatenate the boundary and initial condition points, so that all of
+        # them are predicted with a single forward pass in the train step
+        self.boundary_initial_input = tf.concat(
+            [
+                self.dirichlet_input,
+                self.initial_Ez_input,
+                self.initial_Hx_input,
+                self.initial_Hy_input,
+            ],
+            axis=0,
+        )
+        # Actual values of the boundary and initial conditions, in the same order
+        self.boundary_initial_actual = tf.reshape(
+            tf.concat(
+                [
+                    self.dirichlet_actual,
+                    self.initial_Ez_actual,
+                    self.initial_Hx_actual,
+                    self.initial_Hy_actual,
+                ],
+                axis=0,
+            ),
+            [-1],
+        )
+        # Segment id of every point : 0 - dirichlet, 1 - initial Ez,
+        # 2 - initial Hx, 3 - initial Hy
+        self.boundary_initial_segment_ids = tf.repeat(
+            tf.range(4),
+            [
+                self.dirichlet_input.shape[0],
+                self.initial_Ez_input.shape[0],
+                self.initial_Hx_input.shape[0],
+                self.initial_Hy_input.shape[0],
+            ],
+        )
+        # One-hot mask of the output component (Ez, Hx, Hy) constrained in
+        # every segment, the dirichlet condition is applied on Ez
+        self.boundary_initial_mask = tf.one_hot(
+            tf.gather([0, 0, 1, 2], self.boundary_initial_segment_ids),
+            depth=3,
+            dtype=self.tensor_dtype,
+        )
 
         self.force_matrix = self.force_function_values
 
+        # Shard the collocation points and their forcing values across the
+        # replicas for data parallel training, the boundary and initial points
+        # are replicated
+        if self.strategy is not None:
+            n_replicas = self.strategy.num_replicas_in_sync
+            n_points = self.input_tensor.shape[0]
+            if n_points < n_replicas:
+                raise ValueError(
+                    f"Cannot shard {n_points} collocation points across "
+                    f"{n_replicas} replicas, every replica needs at least one point"
+                )
+            if self.force_matrix.shape[0] != n_points:
+                raise ValueError(
+                    "The forcing values must have one row per collocation point "
+                    f"to be sharded, got {self.force_matrix.shape[0]} rows for "
+                    f"{n_points} points"
+                )
+            shard_sizes = [
+                n_points // n_replicas + (replica < n_points % n_replicas)
+                for replica in range(n_replicas)
+            ]
+            input_shards = tf.split(self.input_tensor, shard_sizes, axis=0)
+            force_shards = tf.split(self.force_matrix, shard_sizes, axis=0)
+            self.distributed_input_tensor = (
+                self.strategy.experimental_distribute_values_from_function(
+                    lambda ctx: input_shards[ctx.replica_id_in_sync_group]
+                )
+            )
+            self.distributed_force_matrix = (
+                self.strategy.experimental_distribute_values_from_function(
+                    lambda ctx: force_shards[ctx.replica_id_in_sync_group]
+                )
+            )
+
         print(f"{'-'*74}")
         print(f"| {'PARAMETER':<25} | {'SHAPE':<25} |")
         print(f"{'-'*74}")
@@ -212,30 +319,32 @@ class DenseModel(tf.keras.Model):
         ## --------------------- MODEL ARCHITECTURE ------------------------ ##
         ## ----------------------------------------------------------------- ##
 
-        # Build dense layers based on the input list
-        for dim in range(len(self.layer_dims) - 2):
-            # Try Xavier initialization with a smaller scale
-            kernel_initializer = tf.keras.initializers.GlorotUniform(seed=42)
-            tf.print(f"Adding Dense Layer with {self.layer_dims[dim + 1]} units")
-            self.layer_list.append(
+        # Build the dense layers based on the input list as a single
+        # Sequential block, with a linear output layer at the end.
+        # Xavier initialization, the seed is offset by the layer index so
+        # that layers of the same shape do not start from identical weights
+        self.net = tf.keras.Sequential(
+            [
                 TensorflowDense.create_layer(
-                    units=self.layer_dims[dim + 1],
+                    units=units,
                     activation="tanh",
                     dtype=tf.float32,
-                    kernel_initializer=kernel_initializer,
+                    kernel_initializer=tf.keras.initializers.GlorotUniform(
+                        seed=42 + dim
+                    ),
                     bias_initializer="zeros",
                 )
-            )
-
-        # Add a output layer with no activation
-        self.layer_list.append(
-            TensorflowDense.create_layer(
-                units=self.layer_dims[-1],
-                activation=None,
-                dtype=tf.float32,
-                kernel_initializer="glorot_uniform",
-                bias_initializer="zeros",
-            )
+                for dim, units in enumerate(self.layer_dims[1:-1])
+            ]
+            + [
+                TensorflowDense.create_layer(
+                    units=self.layer_dims[-1],
+                    activation=None,
+                    dtype=tf.float32,
+                    kernel_initializer="glorot_uniform",
+                    bias_initializer="zeros",
+                )
+            ]
         )
 
         # Compile the model
@@ -264,110 +373,221 @@ class DenseModel(tf.keras.Model):
         if self.use_attention:
             x = self.attention_layer([x, x])
 
-        # Loop through the dense layers
-        for layer in self.layer_list:
-            x = layer(x)
+        return self.net(x)
 
-        return x
+    def compute_losses(
+        self,
+        input_tensor,
+        force_matrix,
+        beta_boundary,
+        beta_initial,
+        bilinear_params_dict,
+    ) -> tuple:
+        """
+        Compute the PDE residual, boundary and initial condition losses.
 
-    @tf.function
+        Must be called within a gradient tape recording the trainable variables.
+
+        Args:
+            input_tensor: The collocation points on which the PDE residual is
+                computed
+            force_matrix: The forcing values at the collocation points
+            beta_boundary: The weight for the boundary loss
+            beta_initial: The weight for the initial condition loss
+            bilinear_params_dict: The bilinear parameters dictionary
+
+        Returns:
+            tuple: The PDE residual, the boundary loss, the initial condition
+                loss and the total loss.
+        """
+        # Predict boundary and initial values with a single forward pass
+        predicted_values_boundary_initial = self(
+            self.boundary_initial_input, training=True
+        )
+        # Select the constrained output component at every point
+        predicted_values_boundary_initial = tf.reduce_sum(
+            predicted_values_boundary_initial * self.boundary_initial_mask, axis=1
+        )
+
+        # Derivatives of (Ez, Hx, Hy) wrt (x, y, t) in forward mode with a
+        # single JVP. The points are tiled once per direction (x, y, t) and
+        # every copy is seeded with the unit tangent of its direction, so one
+        # forward traversal gives the derivatives of all three outputs along
+        # all three directions, without keeping an inner tape alive.
+        n_points = tf.shape(input_tensor)[0]
+        tiled_input = tf.tile(input_tensor, [3, 1])
+        tangents = tf.repeat(tf.eye(3, dtype=input_tensor.dtype), n_points, axis=0)
+        with tf.autodiff.ForwardAccumulator(tiled_input, tangents) as acc:
+            tiled_predicted_values = self(tiled_input, training=True)
+        # shape of each : (N_points, 3)
+        grad_x, grad_y, grad_t = tf.split(acc.jvp(tiled_predicted_values), 3, axis=0)
+        # the primal is the same for every copy, keep the first one
+        predicted_values = tiled_predicted_values[:n_points]
+
+        # Split the output and its derivatives into the field components
+        Ez, Hx, Hy = tf.split(predicted_values, 3, axis=1)
+
+        grad_x_Ez, grad_x_Hx, grad_x_Hy = tf.split(grad_x, 3, axis=1)
+        grad_y_Ez, grad_y_Hx, grad_y_Hy = tf.split(grad_y, 3, axis=1)
+        grad_t_Ez, grad_t_Hx, grad_t_Hy = tf.split(grad_t, 3, axis=1)
+
+        pde_residual = self.loss_function(
+            pred_nn_Ez=Ez,
+            pred_nn_Hx=Hx,
+            pred_nn_Hy=Hy,
+            pred_grad_x_nn_Ez=grad_x_Ez,
+            pred_grad_x_nn_Hx=grad_x_Hx,
+            pred_grad_x_nn_Hy=grad_x_Hy,
+            pred_grad_y_nn_Ez=grad_y_Ez,
+            pred_grad_y_nn_Hx=grad_y_Hx,
+            pred_grad_y_nn_Hy=grad_y_Hy,
+            pred_grad_t_nn_Ez=grad_t_Ez,
+            pred_grad_t_nn_Hx=grad_t_Hx,
+            pred_grad_t_nn_Hy=grad_t_Hy,
+            forcing_function_1=force_matrix,
+            forcing_function_2=force_matrix,
+            forcing_function_3=force_matrix,
+            bilinear_params=bilinear_params_dict,
+        )
+
+        # Boundary and initial conditions, the mean squared error of every
+        # segment is computed with a single reduction
+        boundary_initial_losses = tf.math.unsorted_segment_mean(
+            tf.math.squared_difference(
+                predicted_values_boundary_initial, self.boundary_initial_actual
+            ),
+            self.boundary_initial_segment_ids,
+            num_segments=4,
+        )
+        boundary_loss, initial_Ez_loss, initial_Hx_loss, initial_Hy_loss = tf.unstack(
+            boundary_initial_losses
+        )
+        initial_loss = initial_Ez_loss + initial_Hx_loss + initial_Hy_loss
+
+        total_loss = (
+            pde_residual + beta_boundary * boundary_loss + beta_initial * initial_loss
+        )
+
+        return pde_residual, boundary_loss, initial_loss, total_loss
+
+    # The whole step (forward pass, derivatives, losses and the optimizer
+    # update) is compiled with XLA into a single cluster
+    @tf.function(jit_compile=True)
     def train_step(
         self, beta_boundary=10.0, beta_initial=100.0, bilinear_params_dict=None
     ) -> dict:
-        with tf.GradientTape(persistent=True) as tape:
-            # Predict boundary values
-            predicted_values_dirichlet = self(self.dirichlet_input, training=True)[
-                :, 0:1
-            ]
-            predicted_values_initial_Ez = self(self.initial_Ez_input, training=True)[
-                :, 0:1
-            ]
-            predicted_values_initial_Hx = self(self.initial_Hx_input, training=True)[
-                :, 1:2
-            ]
-            predicted_values_initial_Hy = self(self.initial_Hy_input, training=True)[
-                :, 2:3
-            ]
+        """
+        The train step method for the model.
 
-            total_loss = 0.0
-
-            with tf.GradientTape(persistent=True) as tape1:
-                tape1.watch(self.input_tensor)
-
-                predicted_values = self(self.input_tensor, training=True)
-
-                Ez = predicted_values[:, 0:1]
-                Hx = predicted_values[:, 1:2]
-                Hy = predicted_values[:, 2:3]
-
-            grad_Ez = tape1.gradient(Ez, self.input_tensor)
-            grad_Hx = tape1.gradient(Hx, self.input_tensor)
-            grad_Hy = tape1.gradient(Hy, self.input_tensor)
-
-            grad_x_Ez = grad_Ez[:, 0:1]
-            grad_y_Ez = grad_Ez[:, 1:2]
-            grad_t_Ez = grad_Ez[:, 2:3]
-
-            grad_x_Hx = grad_Hx[:, 0:1]
-            grad_y_Hx = grad_Hx[:, 1:2]
-            grad_t_Hx = grad_Hx[:, 2:3]
-
-            grad_x_Hy = grad_Hy[:, 0:1]
-            grad_y_Hy = grad_Hy[:, 1:2]
-            grad_t_Hy = grad_Hy[:, 2:3]
-
-            pde_residual = self.loss_function(
-                pred_nn_Ez=Ez,
-                pred_nn_Hx=Hx,
-                pred_nn_Hy=Hy,
-                pred_grad_x_nn_Ez=grad_x_Ez,
-                pred_grad_x_nn_Hx=grad_x_Hx,
-                pred_grad_x_nn_Hy=grad_x_Hy,
-                pred_grad_y_nn_Ez=grad_y_Ez,
-                pred_grad_y_nn_Hx=grad_y_Hx,
-                pred_grad_y_nn_Hy=grad_y_Hy,
-                pred_grad_t_nn_Ez=grad_t_Ez,
-                pred_grad_t_nn_Hx=grad_t_Hx,
-                pred_grad_t_nn_Hy=grad_t_Hy,
-                forcing_function_1=self.force_matrix,
-                forcing_function_2=self.force_matrix,
-                forcing_function_3=self.force_matrix,
-                bilinear_params=bilinear_params_dict,
-            )
+        Args:
+            beta_boundary: The weight for the boundary loss
+            beta_initial: The weight for the initial condition loss
+            bilinear_params_dict: The bilinear parameters dictionary
 
-            # Boundary conditions
-            boundary_loss = tf.reduce_mean(
-                tf.square(predicted_values_dirichlet - self.dirichlet_actual)
-            )
+        Returns:
+            dict: The loss values for the model.
 
-            initial_Ez_loss = tf.reduce_mean(
-                tf.square(predicted_values_initial_Ez - self.initial_Ez_actual)
+        Note:
+            Pass the weights as tensors rather than python floats, every new
+            python float value triggers a retrace of the step.
+        """
+        with tf.GradientTape() as tape:
+            pde_residual, boundary_loss, initial_loss, total_loss = self.compute_losses(
+                self.input_tensor,
+                self.force_matrix,
+                beta_boundary,
+                beta_initial,
+                bilinear_params_dict,
             )
 
-            initial_Hx_loss = tf.reduce_mean(
-                tf.square(predicted_values_initial_Hx - self.initial_Hx_actual)
-            )
+        trainable_vars = self.trainable_variables
+        self.gradients = tape.gradient(total_loss, trainable_vars)
+        self.optimizer.apply_gradients(zip(self.gradients, trainable_vars))
 
-            initial_Hy_loss = tf.reduce_mean(
-                tf.square(predicted_values_initial_Hy - self.initial_Hy_actual)
-            )
+        return {
+            "loss_pde": pde_residual,
+            "loss_dirichlet": boundary_loss,
+            "loss_initial": initial_loss,
+            "loss": total_loss,
+        }
 
-            total_loss = (
-                pde_residual
-                + beta_boundary * boundary_loss
-                + beta_initial * (initial_Ez_loss + initial_Hx_loss + initial_Hy_loss)
+    @tf.function
+    def distributed_train_step(
+        self, beta_boundary=10.0, beta_initial=100.0, bilinear_params_dict=None
+    ) -> dict:
+        """
+        The data parallel train step method for the model.
+
+        The collocation points and their forcing values are sharded across the
+        replicas of the distribution strategy given to the model, every replica
+        computes the PDE residual on its own shard. The boundary and initial points are
+        replicated. The losses of every replica are weighted so that their sum
+        across the replicas, and the sum of their gradients, equal the losses
+        and gradients over all the points, also when the shards are unequal.
+
+        Args:
+            beta_boundary: The weight for the boundary loss
+            beta_initial: The weight for the initial condition loss
+            bilinear_params_dict: The bilinear parameters dictionary
+
+        Returns:
+            dict: The loss values for the model over all the points.
+
+        Raises:
+            ValueError: If the model was created without a distribution strategy.
+        """
+        if self.strategy is None:
+            raise ValueError(
+                "distributed_train_step requires the model to be created with "
+                "a distribute_strategy"
             )
-            # tf.print(f"PDE Residual Shape: {pde_residual.shape}")
-            # tf.print(f"Boundary Loss Shape: {boundary_loss.shape}")
-            # tf.print(f"Initial Loss Shape: {initial_Ez_loss.shape}")
 
-        trainable_vars = self.trainable_variables
-        self.gradients = tape.gradient(total_loss, trainable_vars)
-        self.optimizer.apply_gradients(zip(self.gradients, trainable_vars))
+        strategy = self.strategy
+        n_points = self.input_tensor.shape[0]
+
+        def replica_step(input_tensor, force_matrix):
+            with tf.GradientTape() as tape:
+                pde_residual, boundary_loss, initial_loss, _ = self.compute_losses(
+                    input_tensor,
+                    force_matrix,
+                    beta_boundary,
+                    beta_initial,
+                    bilinear_params_dict,
+                )
+                # The losses and the gradients are summed across the replicas.
+                # The PDE residual is a mean over the shard, weight it by the
+                # fraction of the points in the shard, the boundary and
+                # initial losses are the same on every replica
+                shard_fraction = (
+                    tf.cast(tf.shape(input_tensor)[0], pde_residual.dtype) / n_points
+                )
+                pde_residual = pde_residual * shard_fraction
+                boundary_loss = boundary_loss / strategy.num_replicas_in_sync
+                initial_loss = initial_loss / strategy.num_replicas_in_sync
+                total_loss = (
+                    pde_residual
+                    + beta_boundary * boundary_loss
+                    + beta_initial * initial_loss
+                )
+
+            trainable_vars = self.trainable_variables
+            gradients = tape.gradient(total_loss, trainable_vars)
+            self.optimizer.apply_gradients(zip(gradients, trainable_vars))
+
+            return pde_residual, boundary_loss, initial_loss, total_loss
+
+        per_replica_losses = strategy.run(
+            replica_step,
+            args=(self.distributed_input_tensor, self.distributed_force_matrix),
+        )
+        pde_residual, boundary_loss, initial_loss, total_loss = [
+            strategy.reduce(tf.distribute.ReduceOp.SUM, loss, axis=None)
+            for loss in per_replica_losses
+        ]
 
         return {
             "loss_pde": pde_residual,
             "loss_dirichlet": boundary_loss,
-            "loss_initial": initial_Ez_loss + initial_Hx_loss + initial_Hy_loss,
+            "loss_initial": initial_loss,
             "loss": total_loss,
         }
@@ -91,12 +91,17 @@ def pde_loss_maxwell(
     epsilon = bilinear_params["epsilon"]
     mew = bilinear_params["mu"]
 
-    residual_1 = tf.reduce_mean(
-        tf.square(epsilon * pred_grad_t_nn_Ez - (pred_grad_x_nn_Hy - pred_grad_y_nn_Hx))
+    # Stack the residuals of the three equations, so that they are squared
+    # and reduced at once
+    # shape : (N_points, 3)
+    residual = tf.concat(
+        [
+            epsilon * pred_grad_t_nn_Ez - (pred_grad_x_nn_Hy - pred_grad_y_nn_Hx),
+            mew * pred_grad_t_nn_Hx + pred_grad_y_nn_Ez,
+            mew * pred_grad_t_nn_Hy - pred_grad_x_nn_Ez,
+        ],
+        axis=1,
     )
 
-    residual_2 = tf.reduce_mean(tf.square(mew * pred_grad_t_nn_Hx + pred_grad_y_nn_Ez))
-
-    residual_3 = tf.reduce_mean(tf.square(mew * pred_grad_t_nn_Hy - pred_grad_x_nn_Ez))
-
-    return residual_1 + residual_2 + residual_3
+    # Sum of the mean squared residuals of the three equations
+    return tf.reduce_sum(tf.reduce_mean(tf.square(residual), axis=0))
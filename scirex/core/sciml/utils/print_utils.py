@@ -29,6 +29,8 @@ Purpose: This file contains utility functions to print tables to the console.
 
 Functions:
     - print_table: Print a table with two columns to the console
+    - print_table_fast: Print a table with two columns as plain ASCII text
+    - print_table_streaming: Print a long table as plain ASCII text in chunks
 
 Authors:
     Thivin Anandh D (https://thivinanandh.github.io)
@@ -37,42 +39,404 @@ Version Info:
     27/Dec/2024: Initial version - Thivin Anandh D
 """
 
+import os
+import sys
+from collections import deque
+from functools import lru_cache
+from itertools import starmap
+
+import numpy as np
 from rich.console import Console
 from rich.table import Table
 
+# Formatter for the float values, bound once at import. printf style
+# formatting of a float goes straight to the C float formatter, without
+# parsing a format spec on every call
+_FMT = "%.4f".__mod__
 
-def print_table(title: str, columns: list, col_1_values: list, col_2_values: list):
+
+@lru_cache(maxsize=1)
+def _get_console() -> Console:
     """
-    This function prints a table with two columns to the console.
+    Returns the console object shared by all the print functions.
+
+    The console is created once, it resolves the output stream at print time.
+
+    Returns:
+        Console: The shared console object
+    """
+    return Console()
+
+
+def _use_plain_output() -> bool:
+    """
+    Checks whether tables should be printed as tab separated plain text.
+
+    Plain text is used when stdout is not a terminal (e.g. redirected to a
+    log file). The environment variable SCIREX_PLAIN_TABLES overrides the
+    check, "1" always prints plain text and any other value always renders
+    the table, as ASCII or with Rich when SCIREX_RICH_TABLES=1.
+
+    Returns:
+        bool: True if the tables should be printed as plain text
+    """
+    plain_tables = os.environ.get("SCIREX_PLAIN_TABLES")
+    if plain_tables is not None:
+        return plain_tables == "1"
+    return not sys.stdout.isatty()
+
+
+def _render_table(title: str, columns: list, rows: list) -> str:
+    """
+    Renders a table with Rich to a string.
+
+    Args:
+        title: str: Title of the table
+        columns: list: List of column names
+        rows: list: List of rows, each a tuple of the formatted cell values
+
+    Returns:
+        str: The rendered table
+    """
+    # Get the shared console object
+    console = _get_console()
+
+    # Create a table with a title
+    table = Table(show_header=True, header_style="bold magenta", title=title)
+
+    # Bind the table methods once instead of looking them up for every cell
+    add_column = table.add_column
+    add_row = table.add_row
+
+    # Add columns and rows to the table, the loops are driven by map and
+    # starmap and consumed by a zero length deque so that they run in C
+    deque(map(add_column, columns), maxlen=0)
+    deque(starmap(add_row, rows), maxlen=0)
+
+    # Render the table in memory
+    with console.capture() as capture:
+        console.print(table)
+    return capture.get()
+
+
+@lru_cache(maxsize=64)
+def _render_table_cached(
+    title: str, columns: tuple, rows: tuple, width: int, color_system: str
+) -> str:
+    """
+    Renders a table with Rich to a string, cached for tables which are printed
+    repeatedly (e.g. the same configuration echoed at every run).
 
     Args:
         title: str: Title of the table
+        columns: tuple: Tuple of column names
+        rows: tuple: Tuple of rows, each a tuple of the formatted cell values
+        width: int: Width of the console, only part of the cache key
+        color_system: str: Color system of the console, only part of the
+            cache key
+
+    Returns:
+        str: The rendered table
+    """
+    return _render_table(title, columns, rows)
+
+
+def _check_columns(columns: list):
+    """
+    Checks that two column names are given for the two columns of values.
+
+    Args:
         columns: list: List of column names
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: If the number of column names is not two
+    """
+    if len(columns) != 2:
+        raise ValueError(
+            f"Expected two column names for the two columns of values, got "
+            f"{len(columns)}: {list(columns)}"
+        )
+
+
+def _format_rows(col_1_values: list, col_2_values: list) -> list:
+    """
+    Checks the two columns and formats their values into rows.
+
+    Args:
         col_1_values: list: List of values for column 1
-        col_2_values: list: List of values for column
+        col_2_values: list: List of values for column 2
+
+    Returns:
+        list: List of rows, each a tuple of the column 1 value and the
+            formatted column 2 value
+
+    Raises:
+        ValueError: If the two columns have a different number of values
+    """
+    if len(col_1_values) != len(col_2_values):
+        raise ValueError(
+            f"The columns have a different number of values: {len(col_1_values)} "
+            f"and {len(col_2_values)}"
+        )
+
+    # A float array (e.g. a loss history) is formatted at once by numpy
+    if (
+        isinstance(col_2_values, np.ndarray)
+        and col_2_values.ndim == 1
+        and col_2_values.dtype.kind == "f"
+    ):
+        return list(zip(col_1_values, np.char.mod("%.4f", col_2_values).tolist()))
+
+    # Columns holding a single type (e.g. all metrics or all labels) skip the
+    # per value type check
+    value_types = set(map(type, col_2_values))
+    if value_types == {float}:
+        return list(zip(col_1_values, map(_FMT, col_2_values)))
+    if value_types == {str}:
+        return list(zip(col_1_values, col_2_values))
+
+    # Format the rows ahead of adding them, the exact type check is cheaper
+    # and covers plain floats, subclasses (e.g. np.float64) fall back to
+    # the isinstance check. Values which are already strings are used as is
+    return [
+        (
+            val_1,
+            (
+                _FMT(val_2)
+                if type(val_2) is float or isinstance(val_2, float)
+                else val_2 if type(val_2) is str else str(val_2)
+            ),
+        )
+        for val_1, val_2 in zip(col_1_values, col_2_values)
+    ]
+
+
+def _ascii_cells(rows: list) -> tuple:
+    """
+    Splits the rows into the cells of each column, as strings.
+
+    Args:
+        rows: list: List of rows, each a tuple of the formatted cell values
+
+    Returns:
+        tuple: The list of column 1 cells and the list of column 2 cells
+    """
+    col_1_strs = [val_1 if type(val_1) is str else str(val_1) for val_1, _ in rows]
+    col_2_strs = [val_2 for _, val_2 in rows]
+    return col_1_strs, col_2_strs
+
+
+def _ascii_layout(columns: list, width_1: int, width_2: int) -> tuple:
+    """
+    Builds the row formatter and the separator line of an ASCII table.
+
+    Args:
+        columns: list: List of the two column names
+        width_1: int: Width of the widest cell in column 1
+        width_2: int: Width of the widest cell in column 2
+
+    Returns:
+        tuple: The row formatter and the separator line
+    """
+    width_1 = max(width_1, len(columns[0]))
+    width_2 = max(width_2, len(columns[1]))
+    row_format = f"{{:<{width_1}}}  {{:>{width_2}}}".format
+    separator = "-" * (width_1 + 2 + width_2)
+    return row_format, separator
+
+
+def _render_ascii_table(title: str, columns: list, rows: list) -> str:
+    """
+    Renders a table with two columns as plain ASCII text.
+
+    Args:
+        title: str: Title of the table
+        columns: list: List of the two column names
+        rows: list: List of rows, each a tuple of the formatted cell values
+
+    Returns:
+        str: The rendered table
+    """
+    col_1_strs, col_2_strs = _ascii_cells(rows)
+
+    # Widths of the columns, computed in a single pass over each column
+    row_format, separator = _ascii_layout(
+        columns, max(map(len, col_1_strs)), max(map(len, col_2_strs))
+    )
+
+    lines = [title, separator, row_format(*columns), separator]
+    lines.extend(map(row_format, col_1_strs, col_2_strs))
+    lines.append(separator)
+    return "\n".join(lines) + "\n"
+
+
+def print_table_fast(title: str, columns: list, col_1_values: list, col_2_values: list):
+    """
+    This function prints a table with two columns to the console as plain
+    ASCII text, without going through Rich.
+
+    Args:
+        title: str: Title of the table
+        columns: list: List of the two column names
+        col_1_values: list: List of values for column 1
+        col_2_values: list: List of values for column 2
 
     Returns:
         None
+
+    Raises:
+        ValueError: If the number of column names is not two, or the two
+            columns have a different number of values
     """
+    _check_columns(columns)
+    rows = _format_rows(col_1_values, col_2_values)
 
-    # Create a console object
-    console = Console()
+    # Nothing to print
+    if not rows:
+        return
 
-    # Create a table with a title
-    table = Table(show_header=True, header_style="bold magenta", title=title)
+    # Write the whole table at once
+    sys.stdout.write(_render_ascii_table(title, columns, rows))
+    sys.stdout.flush()
+
+
+def print_table_streaming(
+    title: str,
+    columns: list,
+    col_1_values: list,
+    col_2_values: list,
+    chunk_size: int = 1024,
+):
+    """
+    This function prints a table with two columns to the console as plain
+    ASCII text, chunk by chunk.
+
+    Only one chunk of rows is formatted at a time, so that very long tables
+    (e.g. sweeps over thousands of runs) are printed without building the
+    whole table in memory. The values are formatted twice, once to find the
+    column widths and once to print them.
+
+    Args:
+        title: str: Title of the table
+        columns: list: List of the two column names
+        col_1_values: list: List of values for column 1
+        col_2_values: list: List of values for column 2
+        chunk_size: int: Number of rows formatted and written at once,
+            defaults to 1024
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: If the number of column names is not two, the two
+            columns have a different number of values, or chunk_size is not
+            positive
+    """
+    _check_columns(columns)
+
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+    n_rows = len(col_1_values)
+    if n_rows != len(col_2_values):
+        raise ValueError(
+            f"The columns have a different number of values: {n_rows} "
+            f"and {len(col_2_values)}"
+        )
+
+    # Nothing to print
+    if n_rows == 0:
+        return
+
+    def chunks():
+        for start in range(0, n_rows, chunk_size):
+            end = start + chunk_size
+            yield _ascii_cells(
+                _format_rows(col_1_values[start:end], col_2_values[start:end])
+            )
+
+    # First pass, widths of the columns
+    width_1 = width_2 = 0
+    for col_1_strs, col_2_strs in chunks():
+        width_1 = max(width_1, max(map(len, col_1_strs)))
+        width_2 = max(width_2, max(map(len, col_2_strs)))
+    row_format, separator = _ascii_layout(columns, width_1, width_2)
+
+    # Second pass, write the header and then every chunk at once
+    sys.stdout.write(
+        "\n".join([title, separator, row_format(*columns), separator]) + "\n"
+    )
+    for col_1_strs, col_2_strs in chunks():
+        sys.stdout.write("\n".join(map(row_format, col_1_strs, col_2_strs)) + "\n")
+        sys.stdout.flush()
+    sys.stdout.write(separator + "\n")
+    sys.stdout.flush()
+
+
+def print_table(title: str, columns: list, col_1_values: list, col_2_values: list):
+    """
+    This function prints a table with two columns to the console.
+
+    Args:
+        title: str: Title of the table
+        columns: list: List of the two column names
+        col_1_values: list: List of values for column 1
+        col_2_values: list: List of values for column 2
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: If the number of column names is not two, or the two
+            columns have a different number of values
+
+    Note:
+        The table is printed as plain ASCII text, set SCIREX_RICH_TABLES=1 to
+        print it with Rich instead. When stdout is not a terminal the table
+        is printed as tab separated plain text, see SCIREX_PLAIN_TABLES to
+        override this.
+    """
+    _check_columns(columns)
+    rows = _format_rows(col_1_values, col_2_values)
+
+    # Nothing to print
+    if not rows:
+        return
 
-    # Add columns to the table
-    for column in columns:
-        table.add_column(column)
+    # Without a terminal the styling is stripped anyway, skip the Rich
+    # rendering and write tab separated text
+    if _use_plain_output():
+        lines = [title, "\t".join(columns)]
+        lines.extend("%s\t%s" % row for row in rows)
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+        return
 
-    # Add rows to the table
-    for val_1, val_2 in zip(col_1_values, col_2_values):
-        # check if val_2 is a float
-        if isinstance(val_2, float):
-            # add the row to the table
-            table.add_row(val_1, f"{val_2:.4f}")
+    if os.environ.get("SCIREX_RICH_TABLES") == "1":
+        # Identical tables are rendered only once for a given console width
+        # and color system, rows with unhashable values are rendered without
+        # the cache
+        console = _get_console()
+        cache_key = (
+            title,
+            tuple(columns),
+            tuple(rows),
+            console.width,
+            console.color_system,
+        )
+        try:
+            hash(cache_key)
+        except TypeError:
+            rendered_table = _render_table(title, columns, rows)
         else:
-            table.add_row(val_1, str(val_2))
+            rendered_table = _render_table_cached(*cache_key)
+    else:
+        rendered_table = _render_ascii_table(title, columns, rows)
 
-    # Print the table to the console
-    console.print(table)
+    # Write the rendered table to the console at once, instead of one write
+    # per rendered segment
+    sys.stdout.write(rendered_table)
+    sys.stdout.flush()
@@ -317,3 +317,75 @@ def test_num_test_points(setup_results):
         assert test_points.dtype == precision
         # check shape
         assert test_points.shape == (89 * 89, 2)
+
+
+@pytest.fixture
+def small_fespace(cd2d_test_data_internal):
+    """
+    Generate a small finite element space and domain for the cd2d equation.
+    """
+    bound_function_dict, bound_condition_dict, bilinear_params, rhs, exact_solution = (
+        cd2d_test_data_internal
+    )
+    output_folder = "tests/test_dump"
+    Path(output_folder).mkdir(parents=True, exist_ok=True)
+
+    domain = Geometry_2D("quadrilateral", "internal", 10, 10, output_folder)
+    cells, boundary_points = domain.generate_quad_mesh_internal(
+        x_limits=[0, 1],
+        y_limits=[0, 1],
+        n_cells_x=2,
+        n_cells_y=2,
+        num_boundary_points=100,
+    )
+    fespace = Fespace2D(
+        mesh=domain.mesh,
+        cells=cells,
+        boundary_points=boundary_points,
+        cell_type=domain.mesh_type,
+        fe_order=3,
+        fe_type="jacobi",
+        quad_order=4,
+        quad_type="gauss-jacobi",
+        fe_transformation_type="bilinear",
+        bound_function_dict=bound_function_dict,
+        bound_condition_dict=bound_condition_dict,
+        forcing_function=rhs,
+        output_path=output_folder,
+        generate_mesh_plot=False,
+    )
+
+    return fespace, domain
+
+
+def test_test_function_dtype(small_fespace):
+    """
+    Test function for checking the reduced precision storage of the test functions.
+
+    :param small_fespace: The finite element space and domain.
+    """
+    fespace, domain = small_fespace
+
+    datahandler = DataHandler2D(
+        fespace, domain, dtype=tf.float32, test_function_dtype=tf.bfloat16
+    )
+
+    # only the test function matrices are stored in the reduced precision
+    assert datahandler.shape_val_mat_list.dtype == tf.bfloat16
+    assert datahandler.grad_x_mat_list.dtype == tf.bfloat16
+    assert datahandler.grad_y_mat_list.dtype == tf.bfloat16
+    assert datahandler.x_pde_list.dtype == tf.float32
+    assert datahandler.forcing_function_list.dtype == tf.float32
+
+
+def test_invalid_test_function_dtype(small_fespace):
+    """
+    Test function for checking that a test function dtype which is not a
+    tensorflow dtype raises a TypeError.
+
+    :param small_fespace: The finite element space and domain.
+    """
+    fespace, domain = small_fespace
+
+    with pytest.raises(TypeError):
+        DataHandler2D(fespace, domain, dtype=tf.float32, test_function_dtype="bfloat16")
@@ -0,0 +1,435 @@
+# Copyright (c) 2024 Zenteiq Aitech Innovations Private Limited and
+# AiREX Lab, Indian Institute of Science, Bangalore.
+# All rights reserved.
+#
+# This file is part of SciREX
+# (Scientific Research and Engineering eXcellence Platform),
+# developed jointly by Zenteiq Aitech Innovations and AiREX Lab
+# under the guidance of Prof. Sashikumaar Ganesan.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any clarifications or special considerations,
+# please contact: contact@scirex.org
+
+# Test cases for validating the FastVPINNs loss functions against the
+# reference matvec formulation, on small random tensors.
+
+import numpy as np
+import pytest
+import tensorflow as tf
+
+from scirex.core.sciml.fastvpinns.physics.helmholtz2d import pde_loss_helmholtz
+from scirex.core.sciml.fastvpinns.physics.poisson2d_inverse import (
+    pde_loss_poisson_inverse,
+)
+from scirex.core.sciml.fastvpinns.physics.cd2d_inverse_domain import (
+    pde_loss_cd2d_inverse_domain,
+)
+from scirex.core.sciml.fastvpinns.physics.poisson2d import pde_loss_poisson
+from scirex.core.sciml.fastvpinns.physics.loss_inputs import (
+    accepts_precomputed_inputs,
+    pack_test_functions,
+    precompute_loss_inputs,
+)
+
+N_ELEMENTS, N_TEST, N_QUAD = 4, 5, 6
+
+
+def make_loss_inputs(n_test):
+    """
+    Generate random test functions, NN predictions and forcing term for the
+    given number of test functions.
+    """
+    rng = np.random.default_rng(42)
+
+    def rand(*shape):
+        return tf.constant(rng.standard_normal(shape), dtype=tf.float64)
+
+    return {
+        "test_shape_val_mat": rand(N_ELEMENTS, n_test, N_QUAD),
+        "test_grad_x_mat": rand(N_ELEMENTS, n_test, N_QUAD),
+        "test_grad_y_mat": rand(N_ELEMENTS, n_test, N_QUAD),
+        "pred_nn": rand(N_ELEMENTS, N_QUAD),
+        "pred_grad_x_nn": rand(N_ELEMENTS, N_QUAD),
+        "pred_grad_y_nn": rand(N_ELEMENTS, N_QUAD),
+        "forcing_function": rand(n_test, N_ELEMENTS),
+        "diffusion_coeff": rand(N_ELEMENTS, N_QUAD),
+    }
+
+
+@pytest.fixture
+def loss_inputs():
+    """
+    Generate random test functions, NN predictions and forcing term.
+    """
+    return make_loss_inputs(N_TEST)
+
+
+def precomputed_kwargs(loss_inputs, names):
+    """
+    Build the optional precomputed inputs of a loss.
+    """
+    kwargs = {}
+    if "test_packed_mat" in names:
+        kwargs["test_packed_mat"] = pack_test_functions(
+            loss_inputs["test_shape_val_mat"],
+            loss_inputs["test_grad_x_mat"],
+            loss_inputs["test_grad_y_mat"],
+        )
+    if "forcing_mat" in names:
+        kwargs["forcing_mat"] = tf.transpose(loss_inputs["forcing_function"])
+    return kwargs
+
+
+def reference_matvec(test_mat, pred):
+    """
+    Reference contraction of the baseline formulation, with shape
+    (n_test_functions, n_elements).
+    """
+    return tf.transpose(tf.linalg.matvec(test_mat, pred))
+
+
+@pytest.mark.parametrize(
+    "precomputed",
+    [(), ("test_packed_mat",), ("forcing_mat",), ("test_packed_mat", "forcing_mat")],
+)
+@pytest.mark.parametrize(
+    "bilinear_params", [{"eps": 0.5, "k": 2.0}, {"eps": 0.5, "k": 2.0, "k_sq": 4.0}]
+)
+def test_pde_loss_helmholtz(loss_inputs, precomputed, bilinear_params):
+    """
+    Test that the helmholtz loss matches the reference matvec formulation.
+    """
+    val = reference_matvec(loss_inputs["test_shape_val_mat"], loss_inputs["pred_nn"])
+    diff_x = reference_matvec(
+        loss_inputs["test_grad_x_mat"], loss_inputs["pred_grad_x_nn"]
+    )
+    diff_y = reference_matvec(
+        loss_inputs["test_grad_y_mat"], loss_inputs["pred_grad_y_nn"]
+    )
+    residual = (
+        -bilinear_params["eps"] * (diff_x + diff_y)
+        + bilinear_params["k"] ** 2 * val
+        - loss_inputs["forcing_function"]
+    )
+    expected = tf.reduce_mean(tf.square(residual), axis=0)
+
+    residual_cells = pde_loss_helmholtz(
+        test_shape_val_mat=loss_inputs["test_shape_val_mat"],
+        test_grad_x_mat=loss_inputs["test_grad_x_mat"],
+        test_grad_y_mat=loss_inputs["test_grad_y_mat"],
+        pred_nn=loss_inputs["pred_nn"],
+        pred_grad_x_nn=loss_inputs["pred_grad_x_nn"],
+        pred_grad_y_nn=loss_inputs["pred_grad_y_nn"],
+        forcing_function=loss_inputs["forcing_function"],
+        bilinear_params=bilinear_params,
+        **precomputed_kwargs(loss_inputs, precomputed),
+    )
+
+    assert residual_cells.shape == (N_ELEMENTS,)
+    np.testing.assert_allclose(residual_cells.numpy(), expected.numpy(), rtol=1e-10)
+
+
+@pytest.mark.parametrize("precomputed", [(), ("forcing_mat",)])
+def test_pde_loss_poisson_inverse(loss_inputs, precomputed):
+    """
+    Test that the poisson inverse loss matches the reference matvec formulation.
+    """
+    eps = 0.7
+    diff_x = reference_matvec(
+        loss_inputs["test_grad_x_mat"], loss_inputs["pred_grad_x_nn"]
+    )
+    diff_y = reference_matvec(
+        loss_inputs["test_grad_y_mat"], loss_inputs["pred_grad_y_nn"]
+    )
+    residual = eps * (diff_x + diff_y) - loss_inputs["forcing_function"]
+    expected = tf.reduce_mean(tf.square(residual), axis=0)
+
+    residual_cells = pde_loss_poisson_inverse(
+        test_shape_val_mat=loss_inputs["test_shape_val_mat"],
+        test_grad_x_mat=loss_inputs["test_grad_x_mat"],
+        test_grad_y_mat=loss_inputs["test_grad_y_mat"],
+        pred_nn=loss_inputs["pred_nn"],
+        pred_grad_x_nn=loss_inputs["pred_grad_x_nn"],
+        pred_grad_y_nn=loss_inputs["pred_grad_y_nn"],
+        forcing_function=loss_inputs["forcing_function"],
+        bilinear_params={},
+        inverse_params_dict={"eps": eps},
+        **precomputed_kwargs(loss_inputs, precomputed),
+    )
+
+    assert residual_cells.shape == (N_ELEMENTS,)
+    np.testing.assert_allclose(residual_cells.numpy(), expected.numpy(), rtol=1e-10)
+
+
+@pytest.mark.parametrize(
+    "precomputed",
+    [(), ("test_packed_mat",), ("forcing_mat",), ("test_packed_mat", "forcing_mat")],
+)
+def test_pde_loss_cd2d_inverse_domain(loss_inputs, precomputed):
+    """
+    Test that the cd2d inverse domain loss matches the reference matvec
+    formulation.
+    """
+    bilinear_params = {"b_x": 0.2, "b_y": -0.1, "c": 0.3}
+    eps = loss_inputs["diffusion_coeff"]
+    diff_x = reference_matvec(
+        loss_inputs["test_grad_x_mat"], loss_inputs["pred_grad_x_nn"] * eps
+    )
+    diff_y = reference_matvec(
+        loss_inputs["test_grad_y_mat"], loss_inputs["pred_grad_y_nn"] * eps
+    )
+    val, conv_x, conv_y = (
+        reference_matvec(loss_inputs["test_shape_val_mat"], loss_inputs[pred])
+        for pred in ("pred_nn", "pred_grad_x_nn", "pred_grad_y_nn")
+    )
+    residual = (
+        diff_x
+        + diff_y
+        + bilinear_params["b_x"] * conv_x
+        + bilinear_params["b_y"] * conv_y
+        + bilinear_params["c"] * val
+        - loss_inputs["forcing_function"]
+    )
+    expected = tf.reduce_mean(tf.square(residual), axis=0)
+
+    residual_cells = pde_loss_cd2d_inverse_domain(
+        test_shape_val_mat=loss_inputs["test_shape_val_mat"],
+        test_grad_x_mat=loss_inputs["test_grad_x_mat"],
+        test_grad_y_mat=loss_inputs["test_grad_y_mat"],
+        pred_nn=loss_inputs["pred_nn"],
+        pred_grad_x_nn=loss_inputs["pred_grad_x_nn"],
+        pred_grad_y_nn=loss_inputs["pred_grad_y_nn"],
+        forcing_function=loss_inputs["forcing_function"],
+        bilinear_params=bilinear_params,
+        inverse_params_list=[eps],
+        **precomputed_kwargs(loss_inputs, precomputed),
+    )
+
+    assert residual_cells.shape == (N_ELEMENTS,)
+    np.testing.assert_allclose(residual_cells.numpy(), expected.numpy(), rtol=1e-10)
+
+
+COMPILED_LOSS_CASES = [
+    (pde_loss_helmholtz, {"bilinear_params": {"eps": 0.5, "k": 2.0}}),
+    (
+        pde_loss_poisson_inverse,
+        {"bilinear_params": {}, "inverse_params_dict": {"eps": 0.7}},
+    ),
+    (
+        pde_loss_cd2d_inverse_domain,
+        {"bilinear_params": {"b_x": 0.2, "b_y": -0.1, "c": 0.3}},
+    ),
+]
+
+
+def split_loss_inputs(loss_inputs, pde_loss, extra_kwargs):
+    """
+    Split the diffusion coefficient from the inputs of a loss, and pass it in
+    the extra arguments of the losses which take it.
+    """
+    inputs = dict(loss_inputs)
+    diffusion_coeff = inputs.pop("diffusion_coeff")
+    if pde_loss is pde_loss_cd2d_inverse_domain:
+        extra_kwargs = {**extra_kwargs, "inverse_params_list": [diffusion_coeff]}
+    return inputs, extra_kwargs
+
+
+def bfloat16_inputs(loss_inputs, pde_loss, extra_kwargs):
+    """
+    Build the float32 inputs of a loss, the same inputs with the test
+    functions stored in bfloat16, and the extra arguments of the loss.
+    """
+    inputs_fp32 = {
+        key: tf.cast(value, tf.float32) for key, value in loss_inputs.items()
+    }
+    inputs_fp32, extra_kwargs = split_loss_inputs(inputs_fp32, pde_loss, extra_kwargs)
+
+    inputs_bf16 = dict(inputs_fp32)
+    for key in ("test_shape_val_mat", "test_grad_x_mat", "test_grad_y_mat"):
+        inputs_bf16[key] = tf.cast(inputs_fp32[key], tf.bfloat16)
+
+    return inputs_fp32, inputs_bf16, extra_kwargs
+
+
+@pytest.mark.parametrize("pde_loss, extra_kwargs", COMPILED_LOSS_CASES)
+def test_pde_loss_bfloat16_test_functions(loss_inputs, pde_loss, extra_kwargs):
+    """
+    Test that the losses with the test functions stored in bfloat16 match the
+    float32 losses within the bfloat16 rounding tolerance, and are returned
+    in float32.
+    """
+    inputs_fp32, inputs_bf16, extra_kwargs = bfloat16_inputs(
+        loss_inputs, pde_loss, extra_kwargs
+    )
+
+    residual_fp32 = pde_loss(**inputs_fp32, **extra_kwargs).numpy()
+    residual_bf16 = pde_loss(**inputs_bf16, **extra_kwargs)
+
+    assert residual_bf16.dtype == tf.float32
+    np.testing.assert_allclose(
+        residual_bf16.numpy(),
+        residual_fp32,
+        rtol=2e-2,
+        atol=2e-2 * np.max(residual_fp32),
+    )
+
+
+@pytest.mark.parametrize("pde_loss, extra_kwargs", COMPILED_LOSS_CASES)
+def test_pde_loss_bfloat16_gradients(loss_inputs, pde_loss, extra_kwargs):
+    """
+    Test that the gradients of the losses with respect to the NN predictions
+    can be computed with the test functions stored in bfloat16, as in the
+    train step of the models, and match the float32 gradients within the
+    bfloat16 rounding tolerance.
+    """
+    inputs_fp32, inputs_bf16, extra_kwargs = bfloat16_inputs(
+        loss_inputs, pde_loss, extra_kwargs
+    )
+    pred_keys = ("pred_nn", "pred_grad_x_nn", "pred_grad_y_nn")
+
+    def loss_gradients(inputs):
+        preds = [inputs[key] for key in pred_keys]
+        with tf.GradientTape() as tape:
+            tape.watch(preds)
+            loss = tf.reduce_sum(pde_loss(**inputs, **extra_kwargs))
+        return tape.gradient(
+            loss, preds, unconnected_gradients=tf.UnconnectedGradients.ZERO
+        )
+
+    gradients_fp32 = loss_gradients(inputs_fp32)
+    gradients_bf16 = loss_gradients(inputs_bf16)
+
+    for grad_fp32, grad_bf16 in zip(gradients_fp32, gradients_bf16):
+        assert grad_bf16.dtype == tf.float32
+        np.testing.assert_allclose(
+            grad_bf16.numpy(),
+            grad_fp32.numpy(),
+            rtol=2e-2,
+            atol=2e-2 * np.max(np.abs(grad_fp32.numpy())),
+        )
+
+
+@pytest.mark.parametrize("pde_loss, extra_kwargs", COMPILED_LOSS_CASES)
+def test_pde_loss_number_of_test_functions(pde_loss, extra_kwargs):
+    """
+    Test that the compiled losses can be called again with a different number
+    of test functions, as for a second model or mesh in the same process, and
+    match the uncompiled losses.
+    """
+    for n_test in (N_TEST, N_TEST + 2):
+        inputs, kwargs = split_loss_inputs(
+            make_loss_inputs(n_test), pde_loss, extra_kwargs
+        )
+
+        residual_cells = pde_loss(**inputs, **kwargs)
+        expected = pde_loss.python_function(**inputs, **kwargs)
+
+        assert residual_cells.shape == (N_ELEMENTS,)
+        np.testing.assert_allclose(residual_cells.numpy(), expected.numpy(), rtol=1e-10)
+
+
+@pytest.mark.parametrize(
+    "pde_loss, expected_inputs",
+    [
+        (pde_loss_helmholtz, {"test_packed_mat", "forcing_mat"}),
+        (pde_loss_cd2d_inverse_domain, {"test_packed_mat", "forcing_mat"}),
+        (pde_loss_poisson_inverse, {"forcing_mat"}),
+        (pde_loss_poisson, set()),
+    ],
+)
+def test_precompute_loss_inputs(loss_inputs, pde_loss, expected_inputs):
+    """
+    Test that the precomputed inputs are built only for the losses which
+    declare them, and that the unpacked test functions are dropped when the
+    packed ones are passed.
+    """
+    test_function_mats = [
+        loss_inputs["test_shape_val_mat"],
+        loss_inputs["test_grad_x_mat"],
+        loss_inputs["test_grad_y_mat"],
+    ]
+    inputs = precompute_loss_inputs(
+        pde_loss, test_function_mats, loss_inputs["forcing_function"]
+    )
+
+    test_keys = {"test_shape_val_mat", "test_grad_x_mat", "test_grad_y_mat"}
+    assert set(inputs) == test_keys | expected_inputs
+    if "test_packed_mat" in expected_inputs:
+        assert all(inputs[key] is None for key in test_keys)
+        assert inputs["test_packed_mat"].shape == (N_ELEMENTS, 3 * N_TEST, N_QUAD)
+    else:
+        assert all(inputs[key] is not None for key in test_keys)
+    if "forcing_mat" in expected_inputs:
+        assert inputs["forcing_mat"].shape == (N_ELEMENTS, N_TEST)
+
+
+def test_precompute_loss_inputs_undeclared_loss(loss_inputs):
+    """
+    Test that a loss taking arbitrary keyword arguments, without declaring
+    precomputed inputs, is passed the plain test functions only.
+    """
+
+    def custom_loss(**kwargs):
+        return kwargs
+
+    inputs = precompute_loss_inputs(
+        custom_loss,
+        [loss_inputs["test_shape_val_mat"]] * 3,
+        loss_inputs["forcing_function"],
+    )
+
+    assert set(inputs) == {"test_shape_val_mat", "test_grad_x_mat", "test_grad_y_mat"}
+
+
+def test_accepts_precomputed_inputs_unknown_name():
+    """
+    Test that declaring an unknown precomputed input raises an error.
+    """
+    with pytest.raises(ValueError):
+        accepts_precomputed_inputs("test_packed")
+
+
+def test_pde_loss_precomputed_inputs(loss_inputs):
+    """
+    Test that the helmholtz loss called with the inputs built by
+    precompute_loss_inputs, as in the train step of the models, matches the
+    loss called with the plain test functions.
+    """
+    bilinear_params = {"eps": 0.5, "k": 2.0}
+    test_function_mats = [
+        loss_inputs["test_shape_val_mat"],
+        loss_inputs["test_grad_x_mat"],
+        loss_inputs["test_grad_y_mat"],
+    ]
+    pred_inputs = {
+        key: loss_inputs[key] for key in ("pred_nn", "pred_grad_x_nn", "pred_grad_y_nn")
+    }
+
+    expected = pde_loss_helmholtz(
+        *test_function_mats,
+        **pred_inputs,
+        forcing_function=loss_inputs["forcing_function"],
+        bilinear_params=bilinear_params,
+    )
+    residual_cells = pde_loss_helmholtz(
+        **pred_inputs,
+        forcing_function=loss_inputs["forcing_function"],
+        bilinear_params=bilinear_params,
+        **precompute_loss_inputs(
+            pde_loss_helmholtz, test_function_mats, loss_inputs["forcing_function"]
+        ),
+    )
+
+    np.testing.assert_allclose(residual_cells.numpy(), expected.numpy(), rtol=1e-10)
@@ -0,0 +1,202 @@
+# Copyright (c) 2024 Zenteiq Aitech Innovations Private Limited and
+# AiREX Lab, Indian Institute of Science, Bangalore.
+# All rights reserved.
+#
+# This file is part of SciREX
+# (Scientific Research and Engineering eXcellence Platform),
+# developed jointly by Zenteiq Aitech Innovations and AiREX Lab
+# under the guidance of Prof. Sashikumaar Ganesan.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any clarifications or special considerations,
+# please contact: contact@scirex.org
+
+# Test cases for the derivatives and the data parallel training of the vector
+# transient model.
+
+import numpy as np
+import pytest
+import tensorflow as tf
+
+from scirex.core.sciml.pinns.model.model_vector_transient import DenseModel
+from scirex.core.sciml.pinns.physics.maxwell import pde_loss_maxwell
+
+# An odd number of collocation points, so that the shards are unequal
+N_COLLOCATION, N_BOUNDARY, N_INITIAL = 15, 8, 4
+
+LEARNING_RATE_DICT = {
+    "initial_learning_rate": 0.001,
+    "use_lr_scheduler": False,
+    "decay_steps": 1000,
+    "decay_rate": 0.98,
+}
+
+BILINEAR_PARAMS_DICT = {
+    "epsilon": tf.constant(1.0, dtype=tf.float32),
+    "mu": tf.constant(1.0, dtype=tf.float32),
+}
+
+
+@pytest.fixture
+def maxwell_inputs():
+    """
+    Generate random collocation, boundary and initial points with their values.
+    """
+    rng = np.random.default_rng(42)
+
+    def rand(n_points, n_columns):
+        return tf.constant(rng.uniform(size=(n_points, n_columns)), dtype=tf.float32)
+
+    input_tensors_list = [rand(N_COLLOCATION, 3), rand(N_BOUNDARY, 3)]
+    input_tensors_list.append(rand(N_BOUNDARY, 1))
+    for _ in range(3):
+        input_tensors_list += [rand(N_INITIAL, 3), rand(N_INITIAL, 1)]
+    force_function_values = rand(N_COLLOCATION, 1)
+
+    return input_tensors_list, force_function_values
+
+
+@pytest.fixture
+def cpu_strategy():
+    """
+    Mirrored strategy over the two logical CPU devices configured by the
+    pytest_configure hook in tests/conftest.py.
+    """
+    devices = [device.name for device in tf.config.list_logical_devices("CPU")]
+    strategy = tf.distribute.MirroredStrategy(devices)
+    assert strategy.num_replicas_in_sync == 2
+    return strategy
+
+
+def create_model(input_tensors_list, force_function_values, **kwargs):
+    """
+    Create a small vector transient model for the maxwell equations.
+    """
+    return DenseModel(
+        layer_dims=[3, 8, 8, 3],
+        learning_rate_dict=LEARNING_RATE_DICT,
+        loss_function=pde_loss_maxwell,
+        input_tensors_list=input_tensors_list,
+        force_function_values=force_function_values,
+        tensor_dtype=tf.float32,
+        **kwargs,
+    )
+
+
+def test_compute_losses_derivatives(maxwell_inputs):
+    """
+    Test that the PDE residual computed with the forward mode derivatives
+    matches the residual computed with the reverse mode Jacobian.
+    """
+    input_tensors_list, force_function_values = maxwell_inputs
+    model = create_model(input_tensors_list, force_function_values)
+    input_tensor = input_tensors_list[0]
+
+    with tf.GradientTape() as tape:
+        tape.watch(input_tensor)
+        predicted_values = model(input_tensor)
+    # shape : (N_points, 3 outputs, 3 inputs)
+    jacobian = tape.batch_jacobian(predicted_values, input_tensor)
+
+    Ez, Hx, Hy = tf.split(predicted_values, 3, axis=1)
+    grad_kwargs = {
+        f"pred_grad_{direction}_nn_{field}": jacobian[:, i, j : j + 1]
+        for i, field in enumerate(("Ez", "Hx", "Hy"))
+        for j, direction in enumerate(("x", "y", "t"))
+    }
+    expected_pde_residual = pde_loss_maxwell(
+        pred_nn_Ez=Ez,
+        pred_nn_Hx=Hx,
+        pred_nn_Hy=Hy,
+        forcing_function_1=force_function_values,
+        forcing_function_2=force_function_values,
+        forcing_function_3=force_function_values,
+        bilinear_params=BILINEAR_PARAMS_DICT,
+        **grad_kwargs,
+    )
+
+    pde_residual, _, _, _ = model.compute_losses(
+        input_tensor, force_function_values, 1.0, 1.0, BILINEAR_PARAMS_DICT
+    )
+
+    np.testing.assert_allclose(
+        pde_residual.numpy(), expected_pde_residual.numpy(), rtol=1e-5
+    )
+
+
+def test_distributed_train_step(maxwell_inputs, cpu_strategy):
+    """
+    Test that the data parallel step gives the same losses as the single
+    device step for the same weights, with unequal shards.
+    """
+    with cpu_strategy.scope():
+        distributed_model = create_model(
+            *maxwell_inputs, distribute_strategy=cpu_strategy
+        )
+    model = create_model(*maxwell_inputs)
+    model.set_weights(distributed_model.get_weights())
+
+    beta_boundary = tf.constant(10.0)
+    beta_initial = tf.constant(100.0)
+    distributed_loss = distributed_model.distributed_train_step(
+        beta_boundary, beta_initial, BILINEAR_PARAMS_DICT
+    )
+    loss = model.train_step(beta_boundary, beta_initial, BILINEAR_PARAMS_DICT)
+
+    for key in ("loss_pde", "loss_dirichlet", "loss_initial", "loss"):
+        np.testing.assert_allclose(
+            distributed_loss[key].numpy(), loss[key].numpy(), rtol=1e-5
+        )
+
+
+def test_distributed_model_outside_scope(maxwell_inputs, cpu_strategy):
+    """
+    Test that creating the model outside the scope of its strategy raises a
+    ValueError.
+    """
+    with pytest.raises(ValueError):
+        create_model(*maxwell_inputs, distribute_strategy=cpu_strategy)
+
+
+def test_distributed_model_forcing_rows(maxwell_inputs, cpu_strategy):
+    """
+    Test that forcing values without one row per collocation point raise a
+    ValueError, as they cannot be sharded with the points.
+    """
+    input_tensors_list, force_function_values = maxwell_inputs
+    with cpu_strategy.scope():
+        with pytest.raises(ValueError):
+            create_model(
+                input_tensors_list,
+                force_function_values[:1],
+                distribute_strategy=cpu_strategy,
+            )
+
+
+def test_distributed_model_too_few_points(maxwell_inputs, cpu_strategy):
+    """
+    Test that fewer collocation points than replicas raise a ValueError.
+    """
+    n_replicas = cpu_strategy.num_replicas_in_sync
+    input_tensors_list, force_function_values = maxwell_inputs
+    input_tensors_list = [input_tensors_list[0][: n_replicas - 1]] + (
+        input_tensors_list[1:]
+    )
+    with cpu_strategy.scope():
+        with pytest.raises(ValueError):
+            create_model(
+                input_tensors_list,
+                force_function_values[: n_replicas - 1],
+                distribute_strategy=cpu_strategy,
+            )
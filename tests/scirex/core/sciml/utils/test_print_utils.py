@@ -0,0 +1,165 @@
+# Copyright (c) 2024 Zenteiq Aitech Innovations Private Limited and
+# AiREX Lab, Indian Institute of Science, Bangalore.
+# All rights reserved.
+#
+# This file is part of SciREX
+# (Scientific Research and Engineering eXcellence Platform),
+# developed jointly by Zenteiq Aitech Innovations and AiREX Lab
+# under the guidance of Prof. Sashikumaar Ganesan.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# For any clarifications or special considerations,
+# please contact: contact@scirex.org
+
+# Test cases for the table printing utilities.
+
+import pytest
+
+from scirex.core.sciml.utils.print_utils import (
+    _get_console,
+    _render_table_cached,
+    print_table,
+    print_table_fast,
+    print_table_streaming,
+)
+
+
+def test_print_table_fast(capsys):
+    """
+    Test that the ASCII table contains the title, the header and the
+    formatted values, with the floats printed to four decimals.
+    """
+    print_table_fast("Metrics", ["Name", "Value"], ["loss", "epochs"], [0.123456, 10])
+    lines = capsys.readouterr().out.splitlines()
+
+    assert lines[0] == "Metrics"
+    assert lines[2].split() == ["Name", "Value"]
+    assert lines[4].split() == ["loss", "0.1235"]
+    assert lines[5].split() == ["epochs", "10"]
+
+
+def test_print_table_plain(capsys, monkeypatch):
+    """
+    Test that the table is printed as tab separated text when plain tables
+    are requested.
+    """
+    monkeypatch.setenv("SCIREX_PLAIN_TABLES", "1")
+    print_table("Metrics", ["Name", "Value"], ["loss"], [0.5])
+
+    assert capsys.readouterr().out == "Metrics\nName\tValue\nloss\t0.5000\n"
+
+
+@pytest.mark.parametrize("print_function", [print_table, print_table_fast])
+def test_print_table_empty(capsys, print_function):
+    """
+    Test that nothing is printed for a table without rows.
+    """
+    print_function("Metrics", ["Name", "Value"], [], [])
+
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize("print_function", [print_table, print_table_fast])
+def test_print_table_length_mismatch(print_function):
+    """
+    Test that columns with a different number of values raise a ValueError.
+    """
+    with pytest.raises(ValueError):
+        print_function("Metrics", ["Name", "Value"], ["loss", "epochs"], [0.5])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+def test_print_table_streaming(capsys, chunk_size):
+    """
+    Test that the streamed table is identical to the table printed at once,
+    for chunks smaller and larger than the table.
+    """
+    col_1_values = [f"run_{i}" for i in range(10)]
+    col_2_values = [i / 3 for i in range(10)]
+
+    print_table_fast("Sweep", ["Run", "Loss"], col_1_values, col_2_values)
+    expected = capsys.readouterr().out
+
+    print_table_streaming(
+        "Sweep", ["Run", "Loss"], col_1_values, col_2_values, chunk_size=chunk_size
+    )
+
+    assert capsys.readouterr().out == expected
+
+
+@pytest.mark.parametrize(
+    "print_function", [print_table, print_table_fast, print_table_streaming]
+)
+@pytest.mark.parametrize("columns", [["Name"], ["Name", "Value", "Unit"]])
+def test_print_table_column_count(print_function, columns):
+    """
+    Test that a number of column names other than two raises a ValueError.
+    """
+    with pytest.raises(ValueError):
+        print_function("Metrics", columns, ["loss"], [0.5])
+
+
+def test_print_table_ascii(capsys, monkeypatch):
+    """
+    Test that print_table renders the ASCII table by default when plain
+    tables are disabled, as print_table_fast does.
+    """
+    monkeypatch.setenv("SCIREX_PLAIN_TABLES", "0")
+    monkeypatch.delenv("SCIREX_RICH_TABLES", raising=False)
+
+    print_table("Metrics", ["Name", "Value"], ["loss", "epochs"], [0.123456, 10])
+    output = capsys.readouterr().out
+
+    print_table_fast("Metrics", ["Name", "Value"], ["loss", "epochs"], [0.123456, 10])
+    assert output == capsys.readouterr().out
+    assert output.splitlines()[4].split() == ["loss", "0.1235"]
+
+
+def test_print_table_rich(capsys, monkeypatch):
+    """
+    Test that print_table renders the table with Rich when requested, and
+    that printing the same table again is served from the render cache.
+    """
+    monkeypatch.setenv("SCIREX_PLAIN_TABLES", "0")
+    monkeypatch.setenv("SCIREX_RICH_TABLES", "1")
+    _render_table_cached.cache_clear()
+
+    print_table("Metrics", ["Name", "Value"], ["loss", "epochs"], [0.123456, 10])
+    first_output = capsys.readouterr().out
+    print_table("Metrics", ["Name", "Value"], ["loss", "epochs"], [0.123456, 10])
+    second_output = capsys.readouterr().out
+
+    assert "Metrics" in first_output
+    assert "0.1235" in first_output
+    assert "epochs" in first_output
+    assert second_output == first_output
+
+    cache_info = _render_table_cached.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 1
+
+    # the console is shared across calls
+    assert _get_console() is _get_console()
+
+
+@pytest.mark.parametrize("chunk_size", [0, -1])
+def test_print_table_streaming_chunk_size(chunk_size):
+    """
+    Test that print_table_streaming raises an error for a chunk size that
+    is not positive.
+    """
+    with pytest.raises(ValueError):
+        print_table_streaming(
+            "Metrics", ["Name", "Value"], ["loss"], [0.5], chunk_size=chunk_size
+        )